@@ -0,0 +1,400 @@
+/*
+ * Optional C implementation of the QPACK integer codec and encoder stream
+ * instruction builders from research/qpack_manual.py.
+ *
+ * research/ is not part of the aioquic distribution, so this module is not
+ * built by setup.py. To build it in place:
+ *
+ *   cc -O2 -shared -fPIC $(python3-config --includes) \
+ *       research/_qpack_codec.c \
+ *       -o research/_qpack_codec$(python3-config --extension-suffix)
+ *
+ * qpack_manual.py uses it automatically when it can be imported.
+ */
+
+#define PY_SSIZE_T_CLEAN
+
+#include <Python.h>
+#include <stdint.h>
+
+#define MODULE_NAME "research._qpack_codec"
+
+/* prefix byte + ceil(64 / 7) continuation bytes */
+#define MAX_INTEGER_LEN 11
+
+static int
+parse_value(PyObject *obj, const char *name, uint64_t *out)
+{
+    *out = PyLong_AsUnsignedLongLong(obj);
+    if (*out == (uint64_t)-1 && PyErr_Occurred()) {
+        if (PyErr_ExceptionMatches(PyExc_OverflowError)) {
+            PyObject *zero = PyLong_FromLong(0);
+            if (zero == NULL)
+                return -1;
+            int negative = PyObject_RichCompareBool(obj, zero, Py_LT);
+            Py_DECREF(zero);
+            if (negative > 0) {
+                PyErr_Clear();
+                PyErr_Format(PyExc_ValueError, "%s must be non-negative, got %S", name, obj);
+            }
+        }
+        return -1;
+    }
+    return 0;
+}
+
+/* Writes the encoded integer to buf and returns its length. */
+static Py_ssize_t
+write_integer(uint8_t *buf, uint64_t value, int prefix_bits, uint8_t prefix_flag)
+{
+    const uint8_t max_prefix = (uint8_t)((1 << prefix_bits) - 1);
+    Py_ssize_t n = 0;
+
+    if (value < max_prefix) {
+        buf[n++] = prefix_flag | (uint8_t)value;
+        return n;
+    }
+
+    buf[n++] = prefix_flag | max_prefix;
+    value -= max_prefix;
+    while (value >= 0x80) {
+        buf[n++] = (uint8_t)((value & 0x7F) | 0x80);
+        value >>= 7;
+    }
+    buf[n++] = (uint8_t)value;
+    return n;
+}
+
+/*
+ * Emits head + first (+ mid + second) as one instruction. With out == NULL
+ * the instruction is returned as a new bytes object; otherwise it is
+ * appended to the bytearray out in place and None is returned.
+ */
+static PyObject *
+emit_instruction(PyObject *out,
+                 const uint8_t *head, Py_ssize_t head_len,
+                 const Py_buffer *first,
+                 const uint8_t *mid, Py_ssize_t mid_len,
+                 const Py_buffer *second)
+{
+    Py_ssize_t total = head_len;
+    if (first != NULL)
+        total += first->len;
+    if (second != NULL)
+        total += mid_len + second->len;
+
+    PyObject *result;
+    char *p;
+    if (out == NULL) {
+        result = PyBytes_FromStringAndSize(NULL, total);
+        if (result == NULL)
+            return NULL;
+        p = PyBytes_AS_STRING(result);
+    } else {
+        Py_ssize_t len = PyByteArray_GET_SIZE(out);
+        if (PyByteArray_Resize(out, len + total) < 0)
+            return NULL;
+        Py_INCREF(Py_None);
+        result = Py_None;
+        p = PyByteArray_AS_STRING(out) + len;
+    }
+
+    memcpy(p, head, head_len);
+    p += head_len;
+    if (first != NULL) {
+        memcpy(p, first->buf, first->len);
+        p += first->len;
+    }
+    if (second != NULL) {
+        memcpy(p, mid, mid_len);
+        p += mid_len;
+        memcpy(p, second->buf, second->len);
+    }
+    return result;
+}
+
+static PyObject *
+qpack_encode_integer(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"value", "prefix_bits", "prefix_flag", NULL};
+    PyObject *value_obj;
+    int prefix_bits;
+    int prefix_flag = 0;
+    uint64_t value;
+    uint8_t buf[MAX_INTEGER_LEN];
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "Oi|i", (char**)kwlist,
+                                     &value_obj, &prefix_bits, &prefix_flag))
+        return NULL;
+
+    if (parse_value(value_obj, "value", &value) < 0)
+        return NULL;
+    if (prefix_bits < 1 || prefix_bits > 8) {
+        PyErr_Format(PyExc_ValueError, "prefix_bits must be 1-8, got %d", prefix_bits);
+        return NULL;
+    }
+    if ((prefix_flag & ((1 << prefix_bits) - 1)) || prefix_flag < 0 || prefix_flag > 0xFF) {
+        PyErr_Format(PyExc_ValueError, "prefix_flag 0x%x overlaps the %d-bit prefix",
+                     prefix_flag, prefix_bits);
+        return NULL;
+    }
+
+    Py_ssize_t n = write_integer(buf, value, prefix_bits, (uint8_t)prefix_flag);
+    return PyBytes_FromStringAndSize((const char*)buf, n);
+}
+
+static PyObject *
+qpack_decode_integer(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"data", "offset", "prefix_bits", NULL};
+    Py_buffer data;
+    Py_ssize_t offset;
+    int prefix_bits;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "y*ni", (char**)kwlist,
+                                     &data, &offset, &prefix_bits))
+        return NULL;
+
+    const uint8_t *p = data.buf;
+    Py_ssize_t len = data.len;
+    PyObject *result = NULL;
+
+    if (prefix_bits < 1 || prefix_bits > 8) {
+        PyErr_Format(PyExc_ValueError, "prefix_bits must be 1-8, got %d", prefix_bits);
+        goto done;
+    }
+    if (offset < 0 || offset >= len) {
+        PyErr_SetString(PyExc_ValueError, "offset beyond data length");
+        goto done;
+    }
+
+    const uint8_t max_prefix = (uint8_t)((1 << prefix_bits) - 1);
+    uint64_t value = p[offset] & max_prefix;
+    Py_ssize_t consumed = 1;
+
+    if (value == max_prefix) {
+        unsigned shift = 0;
+        uint8_t byte;
+        do {
+            if (offset + consumed >= len) {
+                PyErr_SetString(PyExc_ValueError, "truncated integer encoding");
+                goto done;
+            }
+            byte = p[offset + consumed++];
+            uint64_t chunk = shift < 64 ? (uint64_t)(byte & 0x7F) << shift : 0;
+            if (shift > 63 || (chunk >> shift) != (uint64_t)(byte & 0x7F) ||
+                value + chunk < value) {
+                PyErr_SetString(PyExc_ValueError, "integer encoding exceeds 64 bits");
+                goto done;
+            }
+            value += chunk;
+            shift += 7;
+        } while (byte & 0x80);
+    }
+
+    result = Py_BuildValue("Kn", (unsigned long long)value, consumed);
+
+done:
+    PyBuffer_Release(&data);
+    return result;
+}
+
+static PyObject *
+set_dynamic_table_capacity_impl(PyObject *out, PyObject *capacity_obj)
+{
+    uint64_t capacity;
+    uint8_t buf[MAX_INTEGER_LEN];
+
+    if (parse_value(capacity_obj, "capacity", &capacity) < 0)
+        return NULL;
+
+    Py_ssize_t n = write_integer(buf, capacity, 5, 0x20);
+    return emit_instruction(out, buf, n, NULL, NULL, 0, NULL);
+}
+
+static PyObject *
+qpack_set_dynamic_table_capacity(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"capacity", NULL};
+    PyObject *capacity_obj;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", (char**)kwlist, &capacity_obj))
+        return NULL;
+    return set_dynamic_table_capacity_impl(NULL, capacity_obj);
+}
+
+static PyObject *
+qpack_set_dynamic_table_capacity_into(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"out", "capacity", NULL};
+    PyObject *out, *capacity_obj;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O!O", (char**)kwlist,
+                                     &PyByteArray_Type, &out, &capacity_obj))
+        return NULL;
+    return set_dynamic_table_capacity_impl(out, capacity_obj);
+}
+
+static PyObject *
+insert_with_name_ref_impl(PyObject *out, PyObject *index_obj, Py_buffer *value,
+                          int is_static)
+{
+    uint64_t index;
+    uint8_t head[MAX_INTEGER_LEN + MAX_INTEGER_LEN];
+
+    if (parse_value(index_obj, "index", &index) < 0)
+        return NULL;
+
+    Py_ssize_t n = write_integer(head, index, 6, is_static ? 0xC0 : 0x80);
+    n += write_integer(head + n, (uint64_t)value->len, 7, 0x00);
+    return emit_instruction(out, head, n, value, NULL, 0, NULL);
+}
+
+static PyObject *
+qpack_insert_with_name_ref(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"index", "value", "is_static", NULL};
+    PyObject *index_obj;
+    Py_buffer value;
+    int is_static;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "Oy*p", (char**)kwlist,
+                                     &index_obj, &value, &is_static))
+        return NULL;
+
+    PyObject *result = insert_with_name_ref_impl(NULL, index_obj, &value, is_static);
+    PyBuffer_Release(&value);
+    return result;
+}
+
+static PyObject *
+qpack_insert_with_name_ref_into(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"out", "index", "value", "is_static", NULL};
+    PyObject *out, *index_obj;
+    Py_buffer value;
+    int is_static;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O!Oy*p", (char**)kwlist,
+                                     &PyByteArray_Type, &out, &index_obj, &value,
+                                     &is_static))
+        return NULL;
+
+    PyObject *result = insert_with_name_ref_impl(out, index_obj, &value, is_static);
+    PyBuffer_Release(&value);
+    return result;
+}
+
+static PyObject *
+insert_with_literal_name_impl(PyObject *out, Py_buffer *name, Py_buffer *value)
+{
+    uint8_t head[MAX_INTEGER_LEN], mid[MAX_INTEGER_LEN];
+
+    Py_ssize_t head_len = write_integer(head, (uint64_t)name->len, 5, 0x40);
+    Py_ssize_t mid_len = write_integer(mid, (uint64_t)value->len, 7, 0x00);
+    return emit_instruction(out, head, head_len, name, mid, mid_len, value);
+}
+
+static PyObject *
+qpack_insert_with_literal_name(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"name", "value", NULL};
+    Py_buffer name, value;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "y*y*", (char**)kwlist, &name, &value))
+        return NULL;
+
+    PyObject *result = insert_with_literal_name_impl(NULL, &name, &value);
+    PyBuffer_Release(&name);
+    PyBuffer_Release(&value);
+    return result;
+}
+
+static PyObject *
+qpack_insert_with_literal_name_into(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"out", "name", "value", NULL};
+    PyObject *out;
+    Py_buffer name, value;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O!y*y*", (char**)kwlist,
+                                     &PyByteArray_Type, &out, &name, &value))
+        return NULL;
+
+    PyObject *result = insert_with_literal_name_impl(out, &name, &value);
+    PyBuffer_Release(&name);
+    PyBuffer_Release(&value);
+    return result;
+}
+
+static PyObject *
+duplicate_impl(PyObject *out, PyObject *index_obj)
+{
+    uint64_t index;
+    uint8_t buf[MAX_INTEGER_LEN];
+
+    if (parse_value(index_obj, "index", &index) < 0)
+        return NULL;
+
+    Py_ssize_t n = write_integer(buf, index, 5, 0x00);
+    return emit_instruction(out, buf, n, NULL, NULL, 0, NULL);
+}
+
+static PyObject *
+qpack_duplicate(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"index", NULL};
+    PyObject *index_obj;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O", (char**)kwlist, &index_obj))
+        return NULL;
+    return duplicate_impl(NULL, index_obj);
+}
+
+static PyObject *
+qpack_duplicate_into(PyObject *self, PyObject *args, PyObject *kwargs)
+{
+    const char *kwlist[] = {"out", "index", NULL};
+    PyObject *out, *index_obj;
+
+    if (!PyArg_ParseTupleAndKeywords(args, kwargs, "O!O", (char**)kwlist,
+                                     &PyByteArray_Type, &out, &index_obj))
+        return NULL;
+    return duplicate_impl(out, index_obj);
+}
+
+#define KW_METHOD(name, func, doc) \
+    {name, (PyCFunction)(void(*)(void))func, METH_VARARGS | METH_KEYWORDS, doc}
+
+static PyMethodDef module_methods[] = {
+    KW_METHOD("encode_integer", qpack_encode_integer, "Encode a QPACK integer."),
+    KW_METHOD("decode_integer", qpack_decode_integer, "Decode a QPACK integer."),
+    KW_METHOD("set_dynamic_table_capacity", qpack_set_dynamic_table_capacity, "Set Dynamic Table Capacity instruction."),
+    KW_METHOD("set_dynamic_table_capacity_into", qpack_set_dynamic_table_capacity_into, "Append a Set Dynamic Table Capacity instruction."),
+    KW_METHOD("insert_with_name_ref", qpack_insert_with_name_ref, "Insert With Name Reference instruction."),
+    KW_METHOD("insert_with_name_ref_into", qpack_insert_with_name_ref_into, "Append an Insert With Name Reference instruction."),
+    KW_METHOD("insert_with_literal_name", qpack_insert_with_literal_name, "Insert With Literal Name instruction."),
+    KW_METHOD("insert_with_literal_name_into", qpack_insert_with_literal_name_into, "Append an Insert With Literal Name instruction."),
+    KW_METHOD("duplicate", qpack_duplicate, "Duplicate instruction."),
+    KW_METHOD("duplicate_into", qpack_duplicate_into, "Append a Duplicate instruction."),
+    {NULL}
+};
+
+static struct PyModuleDef moduledef = {
+    PyModuleDef_HEAD_INIT,
+    MODULE_NAME,                        /* m_name */
+    "QPACK encoder stream codec.",      /* m_doc */
+    -1,                                 /* m_size */
+    module_methods,                     /* m_methods */
+    NULL,                               /* m_reload */
+    NULL,                               /* m_traverse */
+    NULL,                               /* m_clear */
+    NULL,                               /* m_free */
+};
+
+
+PyMODINIT_FUNC
+PyInit__qpack_codec(void)
+{
+    return PyModule_Create(&moduledef);
+}
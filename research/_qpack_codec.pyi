@@ -0,0 +1,14 @@
+def encode_integer(value: int, prefix_bits: int, prefix_flag: int = 0) -> bytes: ...
+def decode_integer(data: bytes, offset: int, prefix_bits: int) -> tuple[int, int]: ...
+def set_dynamic_table_capacity(capacity: int) -> bytes: ...
+def set_dynamic_table_capacity_into(out: bytearray, capacity: int) -> None: ...
+def insert_with_name_ref(index: int, value: bytes, is_static: bool) -> bytes: ...
+def insert_with_name_ref_into(
+    out: bytearray, index: int, value: bytes, is_static: bool
+) -> None: ...
+def insert_with_literal_name(name: bytes, value: bytes) -> bytes: ...
+def insert_with_literal_name_into(
+    out: bytearray, name: bytes, value: bytes
+) -> None: ...
+def duplicate(index: int) -> bytes: ...
+def duplicate_into(out: bytearray, index: int) -> None: ...
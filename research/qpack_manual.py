@@ -11,26 +11,47 @@ not to produce malformed data.
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Sequence
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, ClassVar, overload
 
-from .qpack_static_table import STATIC_TABLE, STATIC_TABLE_SIZE
+from .qpack_static_table import STATIC_TABLE_NAMES, STATIC_TABLE_SIZE
 
 # ---------------------------------------------------------------------------
 # 1A. QPACK Integer Encoding (RFC 9204 §4.1.1 / RFC 7541 §5.1)
 # ---------------------------------------------------------------------------
 
 
-def encode_integer(value: int, prefix_bits: int) -> bytes:
+def encode_integer(value: int, prefix_bits: int, prefix_flag: int = 0) -> bytes:
     """Encode a QPACK integer with the given prefix width.
 
-    Returns the raw integer bytes. The caller is responsible for OR-ing any
-    pattern/flag bits into the first byte.
+    Returns the integer bytes with ``prefix_flag`` OR-ed into the first
+    byte, so instruction builders can stamp their pattern bits directly.
 
     Args:
         value: Non-negative integer to encode.
         prefix_bits: Number of low bits in the first byte available for
             the integer (1–8).
+        prefix_flag: Pattern/flag bits for the high bits of the first
+            byte. Must not overlap the integer prefix.
     """
+    if 0 <= value < _SMALL_INT_LIMIT and 1 <= prefix_bits <= 8:
+        if not prefix_flag:
+            return _SMALL_INT_CACHE[value][prefix_bits - 1]
+        max_prefix = (1 << prefix_bits) - 1
+        if value < max_prefix and 0 < prefix_flag <= 0xFF:
+            if not prefix_flag & max_prefix:
+                return _SINGLE_BYTE[prefix_flag | value]
+    return _encode_integer(value, prefix_bits, prefix_flag)
+
+
+# Every possible single-byte encoding, indexed by the byte value.
+_SINGLE_BYTE: tuple[bytes, ...] = tuple(bytes((i,)) for i in range(256))
+
+
+def _encode_integer(value: int, prefix_bits: int, prefix_flag: int = 0) -> bytes:
     if value < 0:
         raise ValueError(f"value must be non-negative, got {value}")
     if not 1 <= prefix_bits <= 8:
@@ -38,11 +59,24 @@ def encode_integer(value: int, prefix_bits: int) -> bytes:
 
     max_prefix = (1 << prefix_bits) - 1
 
+    if prefix_flag & max_prefix or not 0 <= prefix_flag <= 0xFF:
+        raise ValueError(
+            f"prefix_flag {prefix_flag:#x} overlaps the {prefix_bits}-bit prefix"
+        )
+
     if value < max_prefix:
-        return bytes([value])
+        return _SINGLE_BYTE[prefix_flag | value]
 
-    buf = bytearray([max_prefix])
+    first = prefix_flag | max_prefix
     value -= max_prefix
+    # One or two continuation bytes cover every value below 2**14 + 255,
+    # i.e. all realistic capacities, indices and string lengths.
+    if value < 0x80:
+        return bytes((first, value))
+    if value < 0x4000:
+        return bytes((first, (value & 0x7F) | 0x80, value >> 7))
+
+    buf = bytearray((first,))
     while value >= 0x80:
         buf.append((value & 0x7F) | 0x80)
         value >>= 7
@@ -50,6 +84,30 @@ def encode_integer(value: int, prefix_bits: int) -> bytes:
     return bytes(buf)
 
 
+# Pre-encoded forms of small integers for every prefix width, indexed as
+# _SMALL_INT_CACHE[value][prefix_bits - 1].
+_SMALL_INT_LIMIT = 64
+_SMALL_INT_CACHE: tuple[tuple[bytes, ...], ...] = tuple(
+    tuple(_encode_integer(v, p) for p in range(1, 9)) for v in range(_SMALL_INT_LIMIT)
+)
+
+
+def encode_integer_into(
+    out: bytearray, value: int, prefix_bits: int, prefix_flag: int = 0
+) -> None:
+    """Append the encoding of a QPACK integer to ``out``.
+
+    Same arguments and validation as encode_integer.
+    """
+    if 0 <= value < _SMALL_INT_LIMIT and 1 <= prefix_bits <= 8:
+        max_prefix = (1 << prefix_bits) - 1
+        if value < max_prefix and 0 <= prefix_flag <= 0xFF:
+            if not prefix_flag & max_prefix:
+                out.append(prefix_flag | value)
+                return
+    out += _encode_integer(value, prefix_bits, prefix_flag)
+
+
 def decode_integer(data: bytes, offset: int, prefix_bits: int) -> tuple[int, int]:
     """Decode a QPACK integer. Returns (value, bytes_consumed).
 
@@ -57,7 +115,7 @@ def decode_integer(data: bytes, offset: int, prefix_bits: int) -> tuple[int, int
     """
     if not 1 <= prefix_bits <= 8:
         raise ValueError(f"prefix_bits must be 1–8, got {prefix_bits}")
-    if offset >= len(data):
+    if not 0 <= offset < len(data):
         raise ValueError("offset beyond data length")
 
     max_prefix = (1 << prefix_bits) - 1
@@ -67,18 +125,25 @@ def decode_integer(data: bytes, offset: int, prefix_bits: int) -> tuple[int, int
     if value < max_prefix:
         return value, consumed
 
-    shift = 0
-    while True:
-        if offset + consumed >= len(data):
+    pos = offset + 1
+    end = len(data)
+    for shift in _CONTINUATION_SHIFTS:
+        if pos >= end:
             raise ValueError("truncated integer encoding")
-        byte = data[offset + consumed]
-        consumed += 1
+        byte = data[pos]
+        pos += 1
         value += (byte & 0x7F) << shift
-        shift += 7
-        if not (byte & 0x80):
-            break
+        if byte < 0x80:
+            # Only the last group (shift 63) can carry the value past 64 bits.
+            if value >> 64:
+                break
+            return value, pos - offset
 
-    return value, consumed
+    raise ValueError("integer encoding exceeds 64 bits")
+
+
+# Bit offsets of the 7-bit continuation groups; ten cover a 64-bit value.
+_CONTINUATION_SHIFTS = (0, 7, 14, 21, 28, 35, 42, 49, 56, 63)
 
 
 # ---------------------------------------------------------------------------
@@ -99,6 +164,14 @@ def encode_string(value: bytes, use_huffman: bool = False) -> bytes:
     return length_bytes + value
 
 
+def encode_string_into(out: bytearray, value: bytes, use_huffman: bool = False) -> None:
+    """Append a length-prefixed string to ``out`` without copying it twice."""
+    if use_huffman:
+        raise NotImplementedError("Huffman encoding not yet supported")
+    encode_integer_into(out, len(value), 7)
+    out += value
+
+
 # ---------------------------------------------------------------------------
 # 1C. Encoder Stream Instructions (RFC 9204 §4.3.1–4.3.4)
 # ---------------------------------------------------------------------------
@@ -109,12 +182,23 @@ def set_dynamic_table_capacity(capacity: int) -> bytes:
 
     Wire format: 0b001xxxxx with 5-bit prefix for capacity.
     """
+    if 0 <= capacity < _SMALL_INT_LIMIT:
+        return _SMALL_CAPACITY_CACHE[capacity]
     if capacity < 0:
         raise ValueError(f"capacity must be non-negative, got {capacity}")
-    int_bytes = encode_integer(capacity, 5)
-    buf = bytearray(int_bytes)
-    buf[0] |= 0x20
-    return bytes(buf)
+    return encode_integer(capacity, 5, prefix_flag=0x20)
+
+
+_SMALL_CAPACITY_CACHE: tuple[bytes, ...] = tuple(
+    _encode_integer(c, 5, prefix_flag=0x20) for c in range(_SMALL_INT_LIMIT)
+)
+
+
+def set_dynamic_table_capacity_into(out: bytearray, capacity: int) -> None:
+    """Append a Set Dynamic Table Capacity instruction to ``out``."""
+    if capacity < 0:
+        raise ValueError(f"capacity must be non-negative, got {capacity}")
+    encode_integer_into(out, capacity, 5, 0x20)
 
 
 def insert_with_name_ref(index: int, value: bytes, is_static: bool) -> bytes:
@@ -127,12 +211,19 @@ def insert_with_name_ref(index: int, value: bytes, is_static: bool) -> bytes:
     """
     if index < 0:
         raise ValueError(f"index must be non-negative, got {index}")
-    int_bytes = encode_integer(index, 6)
-    buf = bytearray(int_bytes)
-    buf[0] |= 0x80  # high bit = 1 (instruction type)
-    if is_static:
-        buf[0] |= 0x40  # S bit = 1
-    return bytes(buf) + encode_string(value)
+    # high bit = 1 (instruction type), S bit = 1 for static
+    flag = 0xC0 if is_static else 0x80
+    return encode_integer(index, 6, prefix_flag=flag) + encode_string(value)
+
+
+def insert_with_name_ref_into(
+    out: bytearray, index: int, value: bytes, is_static: bool
+) -> None:
+    """Append an Insert With Name Reference instruction to ``out``."""
+    if index < 0:
+        raise ValueError(f"index must be non-negative, got {index}")
+    encode_integer_into(out, index, 6, 0xC0 if is_static else 0x80)
+    encode_string_into(out, value)
 
 
 def insert_with_literal_name(name: bytes, value: bytes) -> bytes:
@@ -144,12 +235,30 @@ def insert_with_literal_name(name: bytes, value: bytes) -> bytes:
     Note: The high 2 bits are 01, and the name uses a 5-bit prefix
     for its length, with bit 5 being the Huffman flag for the name.
     """
-    name_str = encode_string(name)
-    # The instruction opcode is 0b01xxxxxx. The name string's first byte
-    # uses a 5-bit length prefix. We need to shift the opcode into bits 6-7.
-    buf = bytearray(name_str)
-    buf[0] |= 0x40  # bit 6 = 1, bit 7 = 0  → 0b01_H_xxxxx
-    return bytes(buf) + encode_string(value)
+    # 0b01_H_xxxxx: opcode in bits 6-7, Huffman flag (0) in bit 5
+    return _encode_two_strings(0x40, name, value)
+
+
+def _encode_two_strings(prefix_flag: int, first: bytes, second: bytes) -> bytes:
+    """Encode a string with a 5-bit length prefix followed by a 7-bit one.
+
+    All four parts are joined in a single allocation.
+    """
+    return b"".join(
+        (
+            encode_integer(len(first), 5, prefix_flag),
+            first,
+            encode_integer(len(second), 7),
+            second,
+        )
+    )
+
+
+def insert_with_literal_name_into(out: bytearray, name: bytes, value: bytes) -> None:
+    """Append an Insert With Literal Name instruction to ``out``."""
+    encode_integer_into(out, len(name), 5, 0x40)
+    out += name
+    encode_string_into(out, value)
 
 
 def duplicate(index: int) -> bytes:
@@ -159,9 +268,36 @@ def duplicate(index: int) -> bytes:
     """
     if index < 0:
         raise ValueError(f"index must be non-negative, got {index}")
-    int_bytes = encode_integer(index, 5)
     # High 3 bits are 000, which is already the case from encode_integer
-    return bytes(int_bytes)
+    return encode_integer(index, 5)
+
+
+def duplicate_into(out: bytearray, index: int) -> None:
+    """Append a Duplicate instruction to ``out``."""
+    if index < 0:
+        raise ValueError(f"index must be non-negative, got {index}")
+    encode_integer_into(out, index, 5)
+
+
+# Prefer the C implementation of the codec and instruction builders when it
+# has been built in place (see _qpack_codec.c). Both decoders reject values
+# above 2**64 - 1; the C encoders also refuse them, while the pure-Python
+# encoders above have no upper bound.
+try:
+    from ._qpack_codec import (  # noqa: F401, F811
+        decode_integer,
+        duplicate,
+        duplicate_into,
+        encode_integer,
+        insert_with_literal_name,
+        insert_with_literal_name_into,
+        insert_with_name_ref,
+        insert_with_name_ref_into,
+        set_dynamic_table_capacity,
+        set_dynamic_table_capacity_into,
+    )
+except ImportError:
+    pass
 
 
 # ---------------------------------------------------------------------------
@@ -171,59 +307,158 @@ def duplicate(index: int) -> bytes:
 ENTRY_OVERHEAD = 32  # RFC 9204 §3.2.1: each entry costs name_len + value_len + 32
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class DynamicTableEntry:
     name: bytes
     value: bytes
+    # name_len + value_len + ENTRY_OVERHEAD, computed once. Derived from
+    # name and value, so it is left out of comparisons.
+    size: int = field(init=False, compare=False)
 
-    @property
-    def size(self) -> int:
-        return len(self.name) + len(self.value) + ENTRY_OVERHEAD
+    def __post_init__(self) -> None:
+        object.__setattr__(
+            self, "size", len(self.name) + len(self.value) + ENTRY_OVERHEAD
+        )
+
+
+class _EntriesView(Sequence[DynamicTableEntry]):
+    """Read-only sequence of DynamicTableEntry over the tracker's columns.
+
+    Holds the column deques rather than the tracker, so the tracker does
+    not form a reference cycle with its own ``entries``.
+    """
+
+    __slots__ = ("_names", "_values")
+
+    def __init__(self, names: deque[bytes], values: deque[bytes]) -> None:
+        self._names = names
+        self._values = values
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @overload
+    def __getitem__(self, index: int) -> DynamicTableEntry: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[DynamicTableEntry]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> DynamicTableEntry | list[DynamicTableEntry]:
+        names, values = self._names, self._values
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(names))
+            if step > 0:
+                pairs: Iterable[tuple[bytes, bytes]] = islice(
+                    zip(names, values), start, stop, step
+                )
+            else:
+                pairs = list(zip(names, values))[index]
+            return [DynamicTableEntry(name=n, value=v) for n, v in pairs]
+        return DynamicTableEntry(name=names[index], value=values[index])
+
+    def __iter__(self) -> Iterator[DynamicTableEntry]:
+        for name, value in zip(self._names, self._values):
+            yield DynamicTableEntry(name=name, value=value)
+
+    def __eq__(self, other: object) -> bool:
+        # Compare like the list of entries the tracker used to expose
+        if isinstance(other, (list, _EntriesView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({list(self)!r})"
 
 
 class DynamicTableTracker:
     """Mirrors the QPACK dynamic table state.
 
     Tracks entries, capacity, and insert count to stay in sync with
-    the instructions we generate.
+    the instructions we generate. Entries are stored column-wise (names,
+    values, sizes) so eviction only touches plain ints; ``entries``
+    exposes them as DynamicTableEntry objects, index 0 = newest. Names
+    and values are always stored as ``bytes``.
     """
 
+    __slots__ = (
+        "_names",
+        "_values",
+        "_sizes",
+        "entries",
+        "capacity",
+        "insert_count",
+        "_current_size",
+    )
+
     def __init__(self) -> None:
-        self.entries: list[DynamicTableEntry] = []  # index 0 = newest
+        self._names: deque[bytes] = deque()  # index 0 = newest
+        self._values: deque[bytes] = deque()
+        self._sizes: deque[int] = deque()
+        self.entries: Sequence[DynamicTableEntry] = _EntriesView(
+            self._names, self._values
+        )
         self.capacity: int = 0
         self.insert_count: int = 0  # absolute index counter
+        self._current_size: int = 0  # running sum of entry sizes
 
     def current_size(self) -> int:
-        return sum(e.size for e in self.entries)
+        if __debug__:
+            assert self._current_size == sum(self._sizes)
+        return self._current_size
 
     def set_capacity(self, capacity: int) -> None:
         self.capacity = capacity
         self._evict()
 
     def insert(self, name: bytes, value: bytes) -> None:
-        entry = DynamicTableEntry(name=name, value=value)
-        if entry.size > self.capacity:
-            raise ValueError(
-                f"entry size {entry.size} exceeds table capacity {self.capacity}"
-            )
-        # Evict from the back until there's room
-        while self.current_size() + entry.size > self.capacity:
-            self.entries.pop()
-        self.entries.insert(0, entry)
+        # Store immutable bytes only, whatever bytes-like object was passed,
+        # so later mutation by the caller cannot desync the tracker.
+        # memoryview() rejects ints and iterables that bytes() would accept.
+        if type(name) is not bytes:
+            name = bytes(memoryview(name))
+        if type(value) is not bytes:
+            value = bytes(memoryview(value))
+        capacity = self.capacity
+        size = len(name) + len(value) + ENTRY_OVERHEAD
+        if size > capacity:
+            raise ValueError(f"entry size {size} exceeds table capacity {capacity}")
+        new_size = self._current_size + size
+        if new_size > capacity:
+            # Evict from the back until there's room
+            names, values, sizes = self._names, self._values, self._sizes
+            while new_size > capacity:
+                new_size -= sizes.pop()
+                names.pop()
+                values.pop()
+        self._names.appendleft(name)
+        self._values.appendleft(value)
+        self._sizes.appendleft(size)
+        self._current_size = new_size
         self.insert_count += 1
 
     def duplicate(self, relative_index: int) -> None:
-        if relative_index < 0 or relative_index >= len(self.entries):
+        if relative_index < 0 or relative_index >= len(self._sizes):
             raise ValueError(
                 f"relative index {relative_index} out of range "
-                f"(table has {len(self.entries)} entries)"
+                f"(table has {len(self._sizes)} entries)"
             )
-        source = self.entries[relative_index]
-        self.insert(source.name, source.value)
+        self.insert(self._names[relative_index], self._values[relative_index])
+
+    def name_at(self, relative_index: int) -> bytes:
+        """Return the name of the entry at ``relative_index`` (0 = newest)."""
+        return self._names[relative_index]
 
     def _evict(self) -> None:
-        while self.current_size() > self.capacity and self.entries:
-            self.entries.pop()
+        capacity = self.capacity
+        current_size = self._current_size
+        names, values, sizes = self._names, self._values, self._sizes
+        while current_size > capacity and sizes:
+            current_size -= sizes.pop()
+            names.pop()
+            values.pop()
+        self._current_size = current_size
 
 
 # ---------------------------------------------------------------------------
@@ -231,21 +466,35 @@ class DynamicTableTracker:
 # ---------------------------------------------------------------------------
 
 
+def _static_index_error(index: int) -> ValueError:
+    return ValueError(
+        f"static table index {index} out of range (0–{STATIC_TABLE_SIZE - 1})"
+    )
+
+
 class ManualQpackEncoder:
     """High-level manual QPACK encoder.
 
-    Each method validates the operation, generates wire-format encoder stream
-    bytes, and updates the internal table tracker to keep them in sync.
+    Each method validates the operation (unless constructed with
+    ``validate=False``), generates wire-format encoder stream bytes, and
+    updates the internal table tracker to keep them in sync.
     """
 
-    def __init__(self, max_table_capacity: int = 0) -> None:
+    __slots__ = ("_table", "_max_table_capacity", "_validate")
+
+    def __init__(self, max_table_capacity: int = 0, validate: bool = True) -> None:
         """
         Args:
             max_table_capacity: The server's SETTINGS_QPACK_MAX_TABLE_CAPACITY.
                 set_capacity() will refuse to exceed this value.
+            validate: If False, skip the encoder's range checks (capacity,
+                static and relative indices) for bulk generation. The caller
+                is then responsible for the arguments; the tracker still
+                rejects inserts that do not fit and unknown duplicates.
         """
         self._table = DynamicTableTracker()
         self._max_table_capacity = max_table_capacity
+        self._validate = validate
 
     @property
     def table(self) -> DynamicTableTracker:
@@ -264,13 +513,8 @@ class ManualQpackEncoder:
 
         Validates capacity <= max_table_capacity, updates tracker.
         """
-        if capacity < 0:
-            raise ValueError(f"capacity must be non-negative, got {capacity}")
-        if capacity > self._max_table_capacity:
-            raise ValueError(
-                f"capacity {capacity} exceeds server's max "
-                f"table capacity {self._max_table_capacity}"
-            )
+        if self._validate:
+            self._check_capacity(capacity)
         instruction = set_dynamic_table_capacity(capacity)
         self._table.set_capacity(capacity)
         return instruction
@@ -280,32 +524,10 @@ class ManualQpackEncoder:
     ) -> bytes:
         """Generate an Insert With Name Reference instruction.
 
-        Validates the index exists in the referenced table, and that
-        the resulting entry fits in the dynamic table.
+        Validates the index exists in the referenced table; the tracker
+        raises ValueError if the resulting entry does not fit.
         """
-        if is_static:
-            if index < 0 or index >= STATIC_TABLE_SIZE:
-                raise ValueError(
-                    f"static table index {index} out of range "
-                    f"(0–{STATIC_TABLE_SIZE - 1})"
-                )
-            name = STATIC_TABLE[index][0]
-        else:
-            if index < 0 or index >= len(self._table.entries):
-                raise ValueError(
-                    f"dynamic table relative index {index} out of range "
-                    f"(table has {len(self._table.entries)} entries)"
-                )
-            name = self._table.entries[index].name
-
-        # Validate it will fit (insert() will raise if not)
-        entry_size = len(name) + len(value) + ENTRY_OVERHEAD
-        if entry_size > self._table.capacity:
-            raise ValueError(
-                f"entry size {entry_size} exceeds table capacity "
-                f"{self._table.capacity}"
-            )
-
+        name = self._ref_name(index, is_static)
         instruction = insert_with_name_ref(index, value, is_static)
         self._table.insert(name, value)
         return instruction
@@ -313,15 +535,8 @@ class ManualQpackEncoder:
     def insert_literal(self, name: bytes, value: bytes) -> bytes:
         """Generate an Insert With Literal Name instruction.
 
-        Validates the entry fits in the dynamic table.
+        The tracker raises ValueError if the entry does not fit.
         """
-        entry_size = len(name) + len(value) + ENTRY_OVERHEAD
-        if entry_size > self._table.capacity:
-            raise ValueError(
-                f"entry size {entry_size} exceeds table capacity "
-                f"{self._table.capacity}"
-            )
-
         instruction = insert_with_literal_name(name, value)
         self._table.insert(name, value)
         return instruction
@@ -331,12 +546,203 @@ class ManualQpackEncoder:
 
         Validates the relative index refers to an existing entry.
         """
+        if self._validate:
+            self._check_relative_index(relative_index)
+        instruction = duplicate(relative_index)
+        self._table.duplicate(relative_index)
+        return instruction
+
+    def append_set_capacity(self, out: bytearray, capacity: int) -> int:
+        """Append a Set Dynamic Table Capacity instruction to ``out``.
+
+        Same validation as set_capacity(). Returns the number of bytes
+        written; on error, ``out`` is left unchanged.
+        """
+        if self._validate:
+            self._check_capacity(capacity)
+        start = len(out)
+        set_dynamic_table_capacity_into(out, capacity)
+        self._table.set_capacity(capacity)
+        return len(out) - start
+
+    def append_insert_name_ref(
+        self, out: bytearray, index: int, value: bytes, is_static: bool = True
+    ) -> int:
+        """Append an Insert With Name Reference instruction to ``out``.
+
+        Same validation as insert_name_ref(). Returns the number of bytes
+        written; on error, ``out`` is left unchanged.
+        """
+        name = self._ref_name(index, is_static)
+        start = len(out)
+        try:
+            insert_with_name_ref_into(out, index, value, is_static)
+            self._table.insert(name, value)
+        except Exception:
+            del out[start:]
+            raise
+        return len(out) - start
+
+    def append_insert_literal(self, out: bytearray, name: bytes, value: bytes) -> int:
+        """Append an Insert With Literal Name instruction to ``out``.
+
+        Returns the number of bytes written; on error, ``out`` is left
+        unchanged.
+        """
+        start = len(out)
+        try:
+            insert_with_literal_name_into(out, name, value)
+            self._table.insert(name, value)
+        except Exception:
+            del out[start:]
+            raise
+        return len(out) - start
+
+    def append_duplicate(self, out: bytearray, relative_index: int) -> int:
+        """Append a Duplicate instruction to ``out``.
+
+        Same validation as duplicate(). Returns the number of bytes
+        written; on error, ``out`` is left unchanged.
+        """
+        if self._validate:
+            self._check_relative_index(relative_index)
+        start = len(out)
+        try:
+            duplicate_into(out, relative_index)
+            self._table.duplicate(relative_index)
+        except Exception:
+            del out[start:]
+            raise
+        return len(out) - start
+
+    # build() / build_into() handlers. Each takes the whole op tuple, writes
+    # straight into ``out`` and, like the append_* methods, leaves ``out``
+    # and the tracker unchanged if it raises.
+    def _build_set_capacity(self, out: bytearray, op: tuple[Any, ...]) -> None:
+        _, capacity = op
+        if self._validate:
+            self._check_capacity(capacity)
+        set_dynamic_table_capacity_into(out, capacity)
+        self._table.set_capacity(capacity)
+
+    def _build_insert_static(self, out: bytearray, op: tuple[Any, ...]) -> None:
+        _, index, value = op
+        if self._validate and not 0 <= index < STATIC_TABLE_SIZE:
+            raise _static_index_error(index)
+        name = STATIC_TABLE_NAMES[index]
+        start = len(out)
+        try:
+            insert_with_name_ref_into(out, index, value, True)
+            self._table.insert(name, value)
+        except Exception:
+            del out[start:]
+            raise
+
+    def _build_insert_dynamic(self, out: bytearray, op: tuple[Any, ...]) -> None:
+        _, index, value = op
+        if self._validate:
+            self._check_dynamic_index(index)
+        table = self._table
+        name = table.name_at(index)
+        start = len(out)
+        try:
+            insert_with_name_ref_into(out, index, value, False)
+            table.insert(name, value)
+        except Exception:
+            del out[start:]
+            raise
+
+    def _build_insert_literal(self, out: bytearray, op: tuple[Any, ...]) -> None:
+        _, name, value = op
+        start = len(out)
+        try:
+            insert_with_literal_name_into(out, name, value)
+            self._table.insert(name, value)
+        except Exception:
+            del out[start:]
+            raise
+
+    def _build_duplicate(self, out: bytearray, op: tuple[Any, ...]) -> None:
+        _, relative_index = op
+        # The tracker range-checks relative_index, after which writing the
+        # instruction cannot fail.
+        self._table.duplicate(relative_index)
+        duplicate_into(out, relative_index)
+
+    # Operation names accepted by build() / build_into(), mapped to the
+    # names of their handlers. The handlers are looked up on the instance,
+    # so a subclass can override them; build() does not go through the
+    # public append_* or insert_* methods.
+    _DISPATCH: ClassVar[dict[str, str]] = {
+        "set_cap": "_build_set_capacity",  # ("set_cap", capacity)
+        "ins_static": "_build_insert_static",  # ("ins_static", index, value)
+        "ins_dynamic": "_build_insert_dynamic",  # ("ins_dynamic", index, value)
+        "ins_literal": "_build_insert_literal",  # ("ins_literal", name, value)
+        "dup": "_build_duplicate",  # ("dup", relative_index)
+    }
+
+    def build(self, ops: Iterable[tuple[Any, ...]]) -> bytes:
+        """Generate the encoder stream bytes for a scripted sequence.
+
+        Each op is a tuple of an operation name followed by its arguments,
+        e.g. ``[("set_cap", 4096), ("ins_static", 17, b"GET"), ("dup", 0)]``.
+        See build_into() for error behaviour.
+        """
+        out = bytearray()
+        self.build_into(out, ops)
+        return bytes(out)
+
+    def build_into(self, out: bytearray, ops: Iterable[tuple[Any, ...]]) -> int:
+        """Append the instructions for ``ops`` to ``out``.
+
+        Returns the number of bytes written. Unknown, empty or wrongly
+        sized ops raise ValueError. If an operation fails, the instructions
+        (and tracker updates) of the operations before it are kept, the
+        failing one leaves nothing in ``out``, and the error is raised.
+        """
+        handlers: dict[str, Callable[[bytearray, tuple[Any, ...]], None]] = {
+            name: getattr(self, attr) for name, attr in self._DISPATCH.items()
+        }
+        start = len(out)
+        for op in ops:
+            try:
+                handler = handlers[op[0]]
+            except KeyError:
+                raise ValueError(f"unknown operation {op[0]!r}") from None
+            except IndexError:
+                raise ValueError("empty operation") from None
+            handler(out, op)
+        return len(out) - start
+
+    def _check_capacity(self, capacity: int) -> None:
+        if capacity < 0:
+            raise ValueError(f"capacity must be non-negative, got {capacity}")
+        if capacity > self._max_table_capacity:
+            raise ValueError(
+                f"capacity {capacity} exceeds server's max "
+                f"table capacity {self._max_table_capacity}"
+            )
+
+    def _check_relative_index(self, relative_index: int) -> None:
         if relative_index < 0 or relative_index >= len(self._table.entries):
             raise ValueError(
                 f"relative index {relative_index} out of range "
                 f"(table has {len(self._table.entries)} entries)"
             )
 
-        instruction = duplicate(relative_index)
-        self._table.duplicate(relative_index)
-        return instruction
+    def _check_dynamic_index(self, index: int) -> None:
+        if index < 0 or index >= len(self._table.entries):
+            raise ValueError(
+                f"dynamic table relative index {index} out of range "
+                f"(table has {len(self._table.entries)} entries)"
+            )
+
+    def _ref_name(self, index: int, is_static: bool) -> bytes:
+        """Return the name an Insert With Name Reference would copy."""
+        if is_static:
+            if self._validate and not 0 <= index < STATIC_TABLE_SIZE:
+                raise _static_index_error(index)
+            return STATIC_TABLE_NAMES[index]
+        if self._validate:
+            self._check_dynamic_index(index)
+        return self._table.name_at(index)
@@ -2,9 +2,13 @@
 
 99 entries, 0-indexed. Each entry is a (name, value) tuple of bytes.
 Ported from pylsqpack/vendor/ls-qpack/lsqpack.c:105-209.
+
+Equal names (and values) are interned after the table is built, so every
+row with the same name shares one object and the lookups below are keyed by
+those same objects.
 """
 
-STATIC_TABLE: tuple[tuple[bytes, bytes], ...] = (
+_STATIC_TABLE_ROWS: tuple[tuple[bytes, bytes], ...] = (
     (b":authority", b""),                                                  # 0
     (b":path", b"/"),                                                      # 1
     (b"age", b"0"),                                                        # 2
@@ -109,4 +113,21 @@ STATIC_TABLE: tuple[tuple[bytes, bytes], ...] = (
     (b"x-frame-options", b"sameorigin"),                                   # 98
 )
 
+_intern: dict[bytes, bytes] = {}
+STATIC_TABLE: tuple[tuple[bytes, bytes], ...] = tuple(
+    (_intern.setdefault(n, n), _intern.setdefault(v, v)) for n, v in _STATIC_TABLE_ROWS
+)
+del _intern, _STATIC_TABLE_ROWS
+
 STATIC_TABLE_SIZE = len(STATIC_TABLE)  # 99
+
+# Flattened view of STATIC_TABLE for hot-path lookups by index.
+STATIC_TABLE_NAMES: tuple[bytes, ...] = tuple(n for n, _ in STATIC_TABLE)
+
+# Reverse lookups. For names that appear several times, the lowest index wins.
+STATIC_TABLE_BY_NAME: dict[bytes, int] = {
+    n: i for i, (n, _) in reversed(list(enumerate(STATIC_TABLE)))
+}
+STATIC_TABLE_BY_NAME_VALUE: dict[tuple[bytes, bytes], int] = {
+    (n, v): i for i, (n, v) in enumerate(STATIC_TABLE)
+}
@@ -4,22 +4,42 @@ Cross-validates against pylsqpack.Decoder to prove our generated bytes
 are valid QPACK that any conformant decoder must accept.
 """
 
-from unittest import TestCase
+import gc
+from dataclasses import FrozenInstanceError
+from unittest import TestCase, skipIf
 
 import pylsqpack
 
 from research.qpack_manual import (
+    DynamicTableEntry,
     DynamicTableTracker,
     ManualQpackEncoder,
+    _encode_integer,
     decode_integer,
     duplicate,
+    duplicate_into,
     encode_integer,
+    encode_integer_into,
     encode_string,
+    encode_string_into,
     insert_with_literal_name,
+    insert_with_literal_name_into,
     insert_with_name_ref,
+    insert_with_name_ref_into,
     set_dynamic_table_capacity,
+    set_dynamic_table_capacity_into,
 )
-from research.qpack_static_table import STATIC_TABLE, STATIC_TABLE_SIZE
+from research.qpack_static_table import (
+    STATIC_TABLE,
+    STATIC_TABLE_BY_NAME,
+    STATIC_TABLE_BY_NAME_VALUE,
+    STATIC_TABLE_SIZE,
+)
+
+try:
+    from research import _qpack_codec
+except ImportError:
+    _qpack_codec = None
 
 
 # ---------------------------------------------------------------------------
@@ -64,6 +84,14 @@ class IntegerEncodingTest(TestCase):
         # 1 < 128 → 0x01
         self.assertEqual(result, bytes([0x1F, 0xE1, 0x01]))
 
+    def test_continuation_boundaries(self):
+        # 5-bit prefix: 31 + 127 is the largest one-continuation value,
+        # 31 + 16383 the largest two-continuation value.
+        self.assertEqual(encode_integer(31 + 127, 5), bytes([0x1F, 0x7F]))
+        self.assertEqual(encode_integer(31 + 128, 5), bytes([0x1F, 0x80, 0x01]))
+        self.assertEqual(encode_integer(31 + 16383, 5), bytes([0x1F, 0xFF, 0x7F]))
+        self.assertEqual(encode_integer(31 + 16384, 5), bytes([0x1F, 0x80, 0x80, 0x01]))
+
     def test_1_bit_prefix(self):
         # 1-bit prefix, value 0 fits
         self.assertEqual(encode_integer(0, 1), b"\x00")
@@ -78,6 +106,18 @@ class IntegerEncodingTest(TestCase):
         result = encode_integer(255, 8)
         self.assertEqual(result, bytes([0xFF, 0x00]))
 
+    def test_prefix_flag(self):
+        self.assertEqual(encode_integer(10, 6, prefix_flag=0xC0), bytes([0xCA]))
+        self.assertEqual(encode_integer(63, 6, prefix_flag=0x80), bytes([0xBF, 0x00]))
+        self.assertEqual(
+            encode_integer(1337, 5, prefix_flag=0x20), bytes([0x3F, 0x9A, 0x0A])
+        )
+
+    def test_prefix_flag_overlap_raises(self):
+        for flag in [0x01, 0x100, -0x40]:
+            with self.assertRaises(ValueError):
+                encode_integer(1, 6, prefix_flag=flag)
+
     def test_negative_raises(self):
         with self.assertRaises(ValueError):
             encode_integer(-1, 5)
@@ -91,7 +131,7 @@ class IntegerEncodingTest(TestCase):
     def test_roundtrip(self):
         """Encode then decode various values and prefix widths."""
         for prefix in range(1, 9):
-            for value in [0, 1, 10, 31, 127, 128, 255, 256, 1337, 65535]:
+            for value in [0, 1, 10, 31, 127, 128, 255, 256, 1337, 65535, 2**62]:
                 encoded = encode_integer(value, prefix)
                 decoded_val, consumed = decode_integer(encoded, 0, prefix)
                 self.assertEqual(decoded_val, value, f"prefix={prefix}, value={value}")
@@ -127,6 +167,29 @@ class IntegerDecodingTest(TestCase):
             # Needs continuation but no more bytes
             decode_integer(bytes([0x1F]), 0, 5)
 
+    def test_offset_out_of_range_raises(self):
+        for offset in [-1, 1]:
+            with self.assertRaises(ValueError):
+                decode_integer(bytes([10]), offset, 5)
+
+    def test_64_bit_value(self):
+        encoded = encode_integer(2**64 - 1, 5)
+        self.assertEqual(len(encoded), 11)
+        self.assertEqual(decode_integer(encoded, 0, 5), (2**64 - 1, 11))
+
+    def test_too_long_raises(self):
+        with self.assertRaises(ValueError):
+            # Eleven continuation bytes cannot encode a 64-bit value
+            decode_integer(bytes([0x1F]) + b"\x80" * 10 + b"\x01", 0, 5)
+
+    def test_overflow_raises(self):
+        with self.assertRaises(ValueError):
+            # Ten continuation bytes, but the value exceeds 2**64 - 1
+            decode_integer(b"\x1f" + b"\xff" * 9 + b"\x7f", 0, 5)
+        with self.assertRaises(ValueError):
+            # 2**64: one more than the encoding in test_64_bit_value
+            decode_integer(b"\x1f\xe1" + b"\xff" * 8 + b"\x01", 0, 5)
+
 
 # ---------------------------------------------------------------------------
 # String encoding
@@ -168,6 +231,11 @@ class SetDynamicTableCapacityTest(TestCase):
         result = set_dynamic_table_capacity(10)
         self.assertEqual(result, bytes([0x20 | 10]))  # 0b001_01010
 
+    def test_small_value_needs_continuation(self):
+        # Capacity 31 = 2^5 - 1 → prefix filled, one continuation byte
+        result = set_dynamic_table_capacity(31)
+        self.assertEqual(result, bytes([0x3F, 0x00]))
+
     def test_value_needs_continuation(self):
         # Capacity 256 with 5-bit prefix
         result = set_dynamic_table_capacity(256)
@@ -234,6 +302,13 @@ class InsertWithLiteralNameTest(TestCase):
         expected = bytes(name_part) + encode_string(b"value")
         self.assertEqual(result, expected)
 
+    def test_long_name_uses_5_bit_prefix(self):
+        name = b"x-" + b"n" * 38  # length 40 overflows the 5-bit prefix
+        result = insert_with_literal_name(name, b"v")
+        # 0x40 | 0x1f, then 40 - 31 = 9 as a continuation byte
+        expected = bytes([0x5F, 0x09]) + name + encode_string(b"v")
+        self.assertEqual(result, expected)
+
     def test_empty_value(self):
         result = insert_with_literal_name(b"x-test", b"")
         name_part = bytearray(encode_string(b"x-test"))
@@ -261,11 +336,154 @@ class DuplicateTest(TestCase):
             duplicate(-1)
 
 
+class IntoVariantsTest(TestCase):
+    """The *_into builders append the same bytes as their counterparts."""
+
+    def test_integer_and_string(self):
+        out = bytearray(b"prefix")
+        encode_integer_into(out, 1337, 5, prefix_flag=0x20)
+        encode_string_into(out, b"x" * 200)
+        self.assertEqual(
+            out,
+            b"prefix"
+            + encode_integer(1337, 5, prefix_flag=0x20)
+            + encode_string(b"x" * 200),
+        )
+
+    def test_instructions(self):
+        out = bytearray()
+        set_dynamic_table_capacity_into(out, 4096)
+        insert_with_name_ref_into(out, 98, b"val", is_static=True)
+        insert_with_literal_name_into(out, b"x-custom", b"value")
+        duplicate_into(out, 31)
+        self.assertEqual(
+            out,
+            set_dynamic_table_capacity(4096)
+            + insert_with_name_ref(98, b"val", is_static=True)
+            + insert_with_literal_name(b"x-custom", b"value")
+            + duplicate(31),
+        )
+
+    def test_negative_raises(self):
+        out = bytearray()
+        with self.assertRaises(ValueError):
+            set_dynamic_table_capacity_into(out, -1)
+        with self.assertRaises(ValueError):
+            insert_with_name_ref_into(out, -1, b"val", is_static=True)
+        with self.assertRaises(ValueError):
+            duplicate_into(out, -1)
+        with self.assertRaises(NotImplementedError):
+            encode_string_into(out, b"test", use_huffman=True)
+        self.assertEqual(out, b"")
+
+
+@skipIf(_qpack_codec is None, "C codec has not been built")
+class QpackCodecExtensionTest(TestCase):
+    """Check the optional C codec against the pure-Python encoder."""
+
+    def test_integer_matches_python(self):
+        for prefix in range(1, 9):
+            flag = 0xFF ^ ((1 << prefix) - 1)
+            for value in [0, 1, 30, 31, 127, 128, 16414, 16415, 2**63, 2**64 - 1]:
+                expected = _encode_integer(value, prefix, flag)
+                self.assertEqual(
+                    _qpack_codec.encode_integer(value, prefix, flag), expected
+                )
+                self.assertEqual(
+                    _qpack_codec.decode_integer(expected, 0, prefix),
+                    (value, len(expected)),
+                )
+
+    def test_instructions_match_python(self):
+        for name in [b"", b"x-custom", b"n" * 40]:
+            for value in [b"", b"v" * 200]:
+                self.assertEqual(
+                    _qpack_codec.insert_with_literal_name(name, value),
+                    _encode_integer(len(name), 5, 0x40) + name + encode_string(value),
+                )
+        for index in [0, 62, 63, 98]:
+            self.assertEqual(
+                _qpack_codec.insert_with_name_ref(index, b"val", is_static=True),
+                _encode_integer(index, 6, 0xC0) + encode_string(b"val"),
+            )
+            self.assertEqual(
+                _qpack_codec.insert_with_name_ref(index, b"val", is_static=False),
+                _encode_integer(index, 6, 0x80) + encode_string(b"val"),
+            )
+        for value in [0, 30, 31, 4096]:
+            self.assertEqual(
+                _qpack_codec.set_dynamic_table_capacity(value),
+                _encode_integer(value, 5, 0x20),
+            )
+            self.assertEqual(_qpack_codec.duplicate(value), _encode_integer(value, 5))
+
+    def test_into_matches_bytes_builders(self):
+        out = bytearray(b"keep")
+        _qpack_codec.set_dynamic_table_capacity_into(out, 4096)
+        _qpack_codec.insert_with_name_ref_into(out, 17, b"v" * 200, True)
+        _qpack_codec.insert_with_name_ref_into(out, 0, b"val", is_static=False)
+        _qpack_codec.insert_with_literal_name_into(out, b"x-custom", b"value")
+        _qpack_codec.duplicate_into(out, 40)
+        self.assertEqual(
+            out,
+            b"keep"
+            + _qpack_codec.set_dynamic_table_capacity(4096)
+            + _qpack_codec.insert_with_name_ref(17, b"v" * 200, True)
+            + _qpack_codec.insert_with_name_ref(0, b"val", False)
+            + _qpack_codec.insert_with_literal_name(b"x-custom", b"value")
+            + _qpack_codec.duplicate(40),
+        )
+        with self.assertRaises(TypeError):
+            _qpack_codec.duplicate_into(b"", 0)
+        with self.assertRaises(ValueError):
+            _qpack_codec.duplicate_into(out, -1)
+
+    def test_errors(self):
+        with self.assertRaises(ValueError):
+            _qpack_codec.encode_integer(-1, 5)
+        with self.assertRaises(ValueError):
+            _qpack_codec.encode_integer(0, 9)
+        with self.assertRaises(ValueError):
+            _qpack_codec.encode_integer(0, 5, prefix_flag=0x01)
+        with self.assertRaises(OverflowError):
+            _qpack_codec.encode_integer(2**64, 5)
+        with self.assertRaises(ValueError):
+            _qpack_codec.decode_integer(bytes([0x1F]), 0, 5)
+        with self.assertRaises(ValueError):
+            _qpack_codec.decode_integer(bytes([0x1F]) + b"\xff" * 10, 0, 5)
+        with self.assertRaises(ValueError):
+            # Ten continuation bytes whose last group overflows 64 bits
+            _qpack_codec.decode_integer(bytes([0x1F]) + b"\xff" * 9 + b"\x7f", 0, 5)
+        with self.assertRaises(ValueError):
+            _qpack_codec.decode_integer(bytes([10]), -1, 5)
+        with self.assertRaises(ValueError):
+            _qpack_codec.duplicate(-1)
+
+
 # ---------------------------------------------------------------------------
 # Dynamic Table Tracker
 # ---------------------------------------------------------------------------
 
 
+class DynamicTableEntryTest(TestCase):
+    def test_size(self):
+        entry = DynamicTableEntry(name=b"x-custom", value=b"value")
+        self.assertEqual(entry.size, 8 + 5 + 32)
+
+    def test_size_is_a_slot(self):
+        self.assertIn("size", DynamicTableEntry.__slots__)
+        entry = DynamicTableEntry(name=b"a", value=b"")
+        with self.assertRaises(FrozenInstanceError):
+            entry.size = 0
+        self.assertEqual(entry.size, 33)
+
+    def test_immutable(self):
+        entry = DynamicTableEntry(name=b"x-custom", value=b"value")
+        with self.assertRaises(FrozenInstanceError):
+            entry.value = b"other"
+        self.assertFalse(hasattr(entry, "__dict__"))
+
+
 class DynamicTableTrackerTest(TestCase):
     def test_initial_state(self):
         t = DynamicTableTracker()
@@ -274,6 +492,12 @@ class DynamicTableTrackerTest(TestCase):
         self.assertEqual(t.insert_count, 0)
         self.assertEqual(t.current_size(), 0)
 
+    def test_no_instance_dict(self):
+        t = DynamicTableTracker()
+        self.assertFalse(hasattr(t, "__dict__"))
+        self.assertFalse(hasattr(t.entries, "__dict__"))
+        self.assertFalse(hasattr(ManualQpackEncoder(), "__dict__"))
+
     def test_set_capacity(self):
         t = DynamicTableTracker()
         t.set_capacity(4096)
@@ -289,6 +513,26 @@ class DynamicTableTrackerTest(TestCase):
         self.assertEqual(t.entries[0].size, 8 + 5 + 32)
         self.assertEqual(t.insert_count, 1)
 
+    def test_insert_stores_bytes(self):
+        t = DynamicTableTracker()
+        t.set_capacity(4096)
+        name = bytearray(b"x-custom")
+        t.insert(name, memoryview(b"value"))
+        name[0:1] = b"y"
+        self.assertIs(type(t.entries[0].name), bytes)
+        self.assertIs(type(t.entries[0].value), bytes)
+        self.assertEqual(t.entries[0].name, b"x-custom")
+        self.assertEqual(t.entries[0].value, b"value")
+
+    def test_insert_rejects_non_bytes_like(self):
+        t = DynamicTableTracker()
+        t.set_capacity(4096)
+        with self.assertRaises(TypeError):
+            t.insert(3, b"value")
+        with self.assertRaises(TypeError):
+            t.insert(b"x-custom", [0x61])
+        self.assertEqual(t.insert_count, 0)
+
     def test_insert_newest_first(self):
         t = DynamicTableTracker()
         t.set_capacity(4096)
@@ -327,6 +571,47 @@ class DynamicTableTrackerTest(TestCase):
         self.assertEqual(len(t.entries), 1)
         self.assertEqual(t.entries[0].name, b"b")  # newest survives
 
+    def test_current_size_tracks_inserts_and_evictions(self):
+        t = DynamicTableTracker()
+        t.set_capacity(69)
+        t.insert(b"a", b"1")
+        self.assertEqual(t.current_size(), 34)
+        t.insert(b"bb", b"2")
+        self.assertEqual(t.current_size(), 34 + 35)
+        # Evicts the oldest entry to make room
+        t.insert(b"c", b"3")
+        self.assertEqual(t.current_size(), 35 + 34)
+        t.set_capacity(34)
+        self.assertEqual(t.current_size(), 34)
+        t.set_capacity(0)
+        self.assertEqual(t.current_size(), 0)
+
+    def test_entries_view(self):
+        t = DynamicTableTracker()
+        t.set_capacity(4096)
+        t.insert(b"a", b"1")
+        t.insert(b"b", b"2")
+        self.assertEqual(
+            list(t.entries),
+            [
+                DynamicTableEntry(name=b"b", value=b"2"),
+                DynamicTableEntry(name=b"a", value=b"1"),
+            ],
+        )
+        self.assertEqual(t.entries[-1].name, b"a")
+        with self.assertRaises(IndexError):
+            t.entries[2]
+        self.assertEqual(t.entries[1:], [DynamicTableEntry(name=b"a", value=b"1")])
+        self.assertEqual(t.entries[::-1], list(reversed(t.entries)))
+        self.assertEqual(t.entries[1:0], [])
+        self.assertEqual(t.entries[-5:1], [DynamicTableEntry(name=b"b", value=b"2")])
+        self.assertEqual(t.name_at(0), b"b")
+
+    def test_entries_view_does_not_reference_tracker(self):
+        # A tracker must be freed by refcounting alone, without the cyclic GC
+        t = DynamicTableTracker()
+        self.assertNotIn(t, gc.get_referents(t.entries))
+
     def test_duplicate(self):
         t = DynamicTableTracker()
         t.set_capacity(4096)
@@ -377,6 +662,14 @@ class ManualQpackEncoderTest(TestCase):
         with self.assertRaises(ValueError):
             enc.insert_name_ref(99, b"val", is_static=True)
 
+    def test_insert_name_ref_static_too_large_raises(self):
+        enc = ManualQpackEncoder(max_table_capacity=4096)
+        enc.set_capacity(40)
+        with self.assertRaises(ValueError):
+            enc.insert_name_ref(0, b"example.com", is_static=True)
+        self.assertEqual(len(enc.table.entries), 0)
+        self.assertEqual(enc.table.insert_count, 0)
+
     def test_insert_name_ref_dynamic(self):
         enc = ManualQpackEncoder(max_table_capacity=4096)
         enc.set_capacity(4096)
@@ -421,6 +714,145 @@ class ManualQpackEncoderTest(TestCase):
         with self.assertRaises(ValueError):
             enc.duplicate(0)
 
+    def test_append_matches_bytes_methods(self):
+        expected_enc = ManualQpackEncoder(max_table_capacity=4096)
+        expected = (
+            expected_enc.set_capacity(4096)
+            + expected_enc.insert_literal(b"x-test", b"val")
+            + expected_enc.insert_name_ref(17, b"GET", is_static=True)
+            + expected_enc.insert_name_ref(1, b"val2", is_static=False)
+            + expected_enc.duplicate(0)
+        )
+
+        enc = ManualQpackEncoder(max_table_capacity=4096)
+        out = bytearray()
+        written = [
+            enc.append_set_capacity(out, 4096),
+            enc.append_insert_literal(out, b"x-test", b"val"),
+            enc.append_insert_name_ref(out, 17, b"GET", is_static=True),
+            enc.append_insert_name_ref(out, 1, b"val2", is_static=False),
+            enc.append_duplicate(out, 0),
+        ]
+        self.assertEqual(out, expected)
+        self.assertEqual(sum(written), len(expected))
+        self.assertEqual(list(enc.table.entries), list(expected_enc.table.entries))
+
+    def test_append_failure_leaves_buffer_unchanged(self):
+        enc = ManualQpackEncoder(max_table_capacity=4096)
+        out = bytearray(b"keep")
+        enc.append_set_capacity(out, 40)
+        size = len(out)
+        with self.assertRaises(ValueError):
+            enc.append_insert_literal(out, b"x-custom", b"value")
+        with self.assertRaises(ValueError):
+            enc.append_insert_name_ref(out, 0, b"example.com", is_static=True)
+        with self.assertRaises(ValueError):
+            enc.append_duplicate(out, 0)
+        with self.assertRaises(ValueError):
+            enc.append_set_capacity(out, 8192)
+        self.assertEqual(len(out), size)
+        self.assertEqual(enc.table.insert_count, 0)
+
+        unchecked = ManualQpackEncoder(max_table_capacity=4096, validate=False)
+        with self.assertRaises(ValueError):
+            unchecked.append_duplicate(out, 0)
+        self.assertEqual(len(out), size)
+
+        enc.append_set_capacity(out, 4096)
+        size = len(out)
+        with self.assertRaises(TypeError):
+            enc.append_insert_literal(out, "x-custom", b"value")
+        self.assertEqual(len(out), size)
+
+    def test_validate_false_matches_validated_output(self):
+        checked = ManualQpackEncoder(max_table_capacity=4096)
+        fast = ManualQpackEncoder(max_table_capacity=4096, validate=False)
+        for enc in (checked, fast):
+            enc.set_capacity(4096)
+        for enc in (checked, fast):
+            self.assertEqual(
+                enc.insert_name_ref(17, b"GET", is_static=True),
+                insert_with_name_ref(17, b"GET", is_static=True),
+            )
+            enc.insert_name_ref(0, b"POST", is_static=False)
+            enc.duplicate(1)
+        self.assertEqual(list(fast.table.entries), list(checked.table.entries))
+
+    def test_validate_false_skips_encoder_checks(self):
+        enc = ManualQpackEncoder(max_table_capacity=1024, validate=False)
+        # Exceeding the peer's limit is left to the caller
+        self.assertEqual(enc.set_capacity(2048), set_dynamic_table_capacity(2048))
+        self.assertEqual(enc.table.capacity, 2048)
+        # The tracker still refuses operations it cannot mirror
+        with self.assertRaises(ValueError):
+            enc.duplicate(0)
+
+    def test_build(self):
+        expected_enc = ManualQpackEncoder(max_table_capacity=4096)
+        expected = (
+            expected_enc.set_capacity(4096)
+            + expected_enc.insert_name_ref(17, b"GET-custom", is_static=True)
+            + expected_enc.insert_literal(b"x-one", b"1")
+            + expected_enc.insert_name_ref(1, b"2", is_static=False)
+            + expected_enc.duplicate(0)
+        )
+
+        enc = ManualQpackEncoder(max_table_capacity=4096)
+        result = enc.build(
+            [
+                ("set_cap", 4096),
+                ("ins_static", 17, b"GET-custom"),
+                ("ins_literal", b"x-one", b"1"),
+                ("ins_dynamic", 1, b"2"),
+                ("dup", 0),
+            ]
+        )
+        self.assertEqual(result, expected)
+        self.assertEqual(list(enc.table.entries), list(expected_enc.table.entries))
+
+    def test_build_into(self):
+        enc = ManualQpackEncoder(max_table_capacity=4096)
+        out = bytearray(b"keep")
+        written = enc.build_into(out, [("set_cap", 4096)])
+        self.assertEqual(out, b"keep" + set_dynamic_table_capacity(4096))
+        self.assertEqual(written, len(out) - 4)
+
+    def test_build_unknown_operation_raises(self):
+        enc = ManualQpackEncoder(max_table_capacity=4096)
+        with self.assertRaises(ValueError):
+            enc.build([("set_cap", 4096), ("evict", 0)])
+        # Operations before the failing one are kept
+        self.assertEqual(enc.table.capacity, 4096)
+
+    def test_build_malformed_operation_raises(self):
+        enc = ManualQpackEncoder(max_table_capacity=4096)
+        for op in [(), ("dup",), ("set_cap", 4096, 0)]:
+            with self.subTest(op=op), self.assertRaises(ValueError):
+                enc.build([op])
+
+    def test_build_into_failed_operation_leaves_nothing(self):
+        enc = ManualQpackEncoder(max_table_capacity=4096)
+        out = bytearray()
+        with self.assertRaises(ValueError):
+            enc.build_into(
+                out,
+                [("set_cap", 40), ("ins_static", 0, b"example.com"), ("dup", 0)],
+            )
+        self.assertEqual(out, set_dynamic_table_capacity(40))
+        self.assertEqual(enc.table.insert_count, 0)
+
+    def test_build_uses_overridden_handlers(self):
+        class CountingEncoder(ManualQpackEncoder):
+            __slots__ = ("duplicates",)
+
+            def _build_duplicate(self, out, op):
+                self.duplicates = getattr(self, "duplicates", 0) + 1
+                super()._build_duplicate(out, op)
+
+        enc = CountingEncoder(max_table_capacity=4096)
+        enc.build([("set_cap", 4096), ("ins_literal", b"x", b"y"), ("dup", 0)])
+        self.assertEqual(enc.duplicates, 1)
+
     def test_max_table_capacity_property(self):
         enc = ManualQpackEncoder(max_table_capacity=1024)
         self.assertEqual(enc.max_table_capacity, 1024)
@@ -643,3 +1075,23 @@ class StaticTableTest(TestCase):
         for i, (name, value) in enumerate(STATIC_TABLE):
             self.assertIsInstance(name, bytes, f"entry {i} name is not bytes")
             self.assertIsInstance(value, bytes, f"entry {i} value is not bytes")
+
+    def test_by_name_returns_first_index(self):
+        self.assertEqual(STATIC_TABLE_BY_NAME[b":authority"], 0)
+        self.assertEqual(STATIC_TABLE_BY_NAME[b":method"], 15)
+        self.assertEqual(STATIC_TABLE_BY_NAME[b":status"], 24)
+        for name, index in STATIC_TABLE_BY_NAME.items():
+            self.assertEqual(STATIC_TABLE[index][0], name)
+            self.assertNotIn(name, [n for n, _ in STATIC_TABLE[:index]])
+
+    def test_by_name_value(self):
+        self.assertEqual(STATIC_TABLE_BY_NAME_VALUE[(b":method", b"GET")], 17)
+        self.assertEqual(len(STATIC_TABLE_BY_NAME_VALUE), STATIC_TABLE_SIZE)
+        for (name, value), index in STATIC_TABLE_BY_NAME_VALUE.items():
+            self.assertEqual(STATIC_TABLE[index], (name, value))
+
+    def test_repeated_names_are_shared(self):
+        seen = {}
+        for name, value in STATIC_TABLE:
+            self.assertIs(seen.setdefault(name, name), name)
+            self.assertIs(seen.setdefault(value, value), value)